@@ -0,0 +1,157 @@
+"""
+Index of already generated examples, so that decks contain no duplicate cards.
+
+Each example is identified by a canonical hash of the choices that determine
+it (for example the template, nouns, tense, shape and polarity of a relative
+clause), which the generators check before doing any inflection or
+serialisation work. Hashes are 64-bit, so millions of entries fit in a few
+tens of megabytes, and the index can be saved to disk to keep examples unique
+across runs. Saving merges with whatever is on disk, so several processes
+generating shards can share one index file.
+"""
+
+import sys
+import json
+import fcntl
+import heapq
+import tempfile
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Iterable, Optional, Set, Union
+
+# Number of new hashes held in a set before they are merged into the sorted array
+PENDING_LIMIT = 65_536
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def example_hash(*parts: Any) -> int:
+    """
+    Compute the canonical hash of an example from the choices that define it.
+
+    Args:
+        parts: JSON-serialisable values (strings, numbers, booleans, lists)
+
+    Returns:
+        Unsigned 64-bit hash
+    """
+    canonical = _encoder.encode(parts)
+    return int.from_bytes(blake2b(canonical.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class DedupIndex:
+    """
+    Set of example hashes, optionally persisted to a file.
+
+    Hashes live in a sorted array of unsigned 64-bit integers, searched by
+    bisection, plus a set of recent additions that is merged into the
+    array once it reaches `pending_limit` entries. The array takes eight
+    bytes per example; on top of that the set holds up to `pending_limit`
+    Python ints (a few megabytes at the default), and each merge briefly holds
+    a second copy of the array.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None,
+                 pending_limit: int = PENDING_LIMIT):
+        """
+        Initialize the index, loading previously seen hashes if `path` exists.
+
+        Args:
+            path: Optional file the index is loaded from and saved to
+            pending_limit: Number of new hashes to buffer before merging
+        """
+        self.path = Path(path) if path else None
+        self.pending_limit = pending_limit
+        self._sorted = array("Q")
+        self._pending: Set[int] = set()
+
+        if self.path and self.path.exists():
+            self._sorted = self._read(self.path)
+
+    @staticmethod
+    def _read(path: Path) -> array:
+        """Read a saved index file into a sorted array."""
+        values = array("Q")
+        with path.open("rb") as f:
+            values.frombytes(f.read())
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def __contains__(self, value: int) -> bool:
+        if value in self._pending:
+            return True
+        position = bisect_left(self._sorted, value)
+        return position < len(self._sorted) and self._sorted[position] == value
+
+    def seen(self, *parts: Any) -> bool:
+        """
+        Check whether an example has been recorded, without recording it.
+
+        Args:
+            parts: Values passed to `example_hash`
+
+        Returns:
+            True if the example has been seen before
+        """
+        return example_hash(*parts) in self
+
+    def add(self, *parts: Any) -> bool:
+        """
+        Record an example, identified by the choices that define it.
+
+        Args:
+            parts: Values passed to `example_hash`
+
+        Returns:
+            True if the example is new, False if it has been seen before
+        """
+        value = example_hash(*parts)
+        if value in self:
+            return False
+
+        self._pending.add(value)
+        if len(self._pending) >= self.pending_limit:
+            self._merge()
+        return True
+
+    def _merge(self, values: Iterable[int] = ()):
+        """Merge pending hashes, and any other sorted `values`, into the sorted array."""
+        merged = array("Q")
+        previous = None
+        for value in heapq.merge(self._sorted, sorted(self._pending), values):
+            if value != previous:
+                merged.append(value)
+                previous = value
+        self._sorted = merged
+        self._pending.clear()
+
+    def save(self):
+        """
+        Write the index to its file, merged with any hashes other processes have saved there.
+
+        The file is locked while it is re-read and replaced, so concurrent
+        saves each keep the other's additions.
+        """
+        if not self.path:
+            raise ValueError("No path given for the dedup index")
+
+        lock_path = self.path.with_suffix(self.path.suffix + ".lock")
+        with lock_path.open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._merge(self._read(self.path) if self.path.exists() else ())
+
+            data = self._sorted
+            if sys.byteorder == "big":
+                data = array("Q", data)
+                data.byteswap()
+
+            with tempfile.NamedTemporaryFile(dir=self.path.parent, prefix=self.path.name + ".",
+                                             delete=False) as f:
+                data.tofile(f)
+            Path(f.name).replace(self.path)
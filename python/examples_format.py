@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Output formats for the relative clause examples consumed by the PWA.
+
+The generator stores each variation's sentence as a `_coded` template string
+such as "${D0} a chuir ${D1} -- ${I0R}", which the front end has to scan for
+placeholders before every card. The helpers here turn that string into a
+pre-tokenised list of literal strings and slot references, so the client
+can render a card by simple concatenation.
+
+It also provides a normalised shared-lexicon format, in which every string
+is stored once and groups and variations refer to it by index, together
+with an expander back to the coded format. Run as a script to convert:
+
+    python examples_format.py normalise examples.json examples-lexicon.json
+    python examples_format.py expand examples-lexicon.json examples.json
+"""
+
+import sys
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Matches placeholders such as ${D0}, ${I1} and ${I0R}
+PLACEHOLDER_PATTERN = re.compile(r"\$\{([DI]\d+)(R?)\}")
+
+
+def tokenise_coded(coded: str, slots: Dict[str, List[str]]) -> List[Any]:
+    """
+    Split a `_coded` template string into literal text and slot references.
+
+    Literal text is kept as plain strings. Each placeholder becomes a
+    `[tag, index]` pair, where `index` picks the form to show from the
+    slot's array: 1 for ${X}, and 2 for ${XR} (falling back to 1 when the
+    slot's third form is missing or empty, as the front end always has).
+
+    Args:
+        coded: Template string as produced by the generator
+        slots: Mapping of slot tags (D0, I0, ...) to their form arrays
+
+    Returns:
+        List of tokens, with the trailing newline of the template removed
+    """
+    tokens: List[Any] = []
+    position = 0
+    coded = coded.rstrip()
+
+    for match in PLACEHOLDER_PATTERN.finditer(coded):
+        if match.start() > position:
+            tokens.append(coded[position:match.start()])
+
+        tag, relative = match.groups()
+        slot = slots.get(tag, [])
+        index = 2 if relative and len(slot) > 2 and slot[2] else 1
+        tokens.append([tag, index])
+        position = match.end()
+
+    if position < len(coded):
+        tokens.append(coded[position:])
+
+    return tokens
+
+
+def tokenise_variation(coded_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace a variation's `_coded` string with its `_tokens` list.
+
+    Args:
+        coded_data: Variation dictionary with slot arrays, `_root` and `_coded`
+
+    Returns:
+        New dictionary with `_tokens` in place of `_coded`
+    """
+    slots = {key: value for key, value in coded_data.items() if not key.startswith("_")}
+    tokenised = {key: value for key, value in coded_data.items() if key != "_coded"}
+    tokenised["_tokens"] = tokenise_coded(coded_data["_coded"], slots)
+    return tokenised
+
+
+class Lexicon:
+    """Table of unique strings, referenced by index from the normalised format."""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._indices: Dict[str, int] = {}
+
+    def index(self, text: str) -> int:
+        """Return the index of `text`, adding it to the table if it is new."""
+        if text not in self._indices:
+            self._indices[text] = len(self.strings)
+            self.strings.append(text)
+        return self._indices[text]
+
+
+def normalise_examples(examples: List[List[List[Any]]]) -> Dict[str, Any]:
+    """
+    Convert example groups into the normalised shared-lexicon format.
+
+    Every string (noun lemmas, inflected forms, verb roots and the literal
+    text between slots, which carries the conjugated verb) is stored once in
+    a global lexicon. Each group keeps one slot table, taken from its first
+    variation, and each variation keeps only its type and tokens, plus the
+    slots that differ from the group table (an indirect object that is
+    relativised takes a prepositional pronoun, for example):
+
+        {"format": "lexicon", "version": 1, "lexicon": [...],
+         "groups": [{"root": 0, "slots": {"D0": [1, 2]},
+                     "variations": [["Unchanged", [3, ["D0", 1]]],
+                                    ["INDIRECT", [...], {"I0": [...]}]]}]}
+
+    Literal tokens are lexicon indices and slot tokens are `[tag, index]`
+    pairs, as produced by `tokenise_coded`.
+
+    Args:
+        examples: Example groups, with either `_coded` or `_tokens` variations
+
+    Returns:
+        Dictionary in the normalised format
+    """
+    lexicon = Lexicon()
+    groups = []
+
+    for example_group in examples:
+        group_slots = None
+        root = None
+        variations = []
+
+        for variation_type, coded_data in example_group:
+            if "_tokens" not in coded_data:
+                coded_data = tokenise_variation(coded_data)
+
+            slots = {
+                key: [lexicon.index(form) for form in value]
+                for key, value in coded_data.items() if not key.startswith("_")
+            }
+            if group_slots is None:
+                group_slots = slots
+                root = lexicon.index(coded_data["_root"])
+
+            tokens = [
+                lexicon.index(token) if isinstance(token, str) else token
+                for token in coded_data["_tokens"]
+            ]
+            variation = [variation_type, tokens]
+            overrides = {key: value for key, value in slots.items() if group_slots.get(key) != value}
+            if overrides:
+                variation.append(overrides)
+            variations.append(variation)
+
+        groups.append({"root": root, "slots": group_slots or {}, "variations": variations})
+
+    return {"format": "lexicon", "version": 1, "lexicon": lexicon.strings, "groups": groups}
+
+
+def expand_normalised(data: Dict[str, Any], tokenised: bool = False) -> List[List[List[Any]]]:
+    """
+    Expand the normalised shared-lexicon format back into example groups.
+
+    Args:
+        data: Dictionary in the normalised format
+        tokenised: Emit `_tokens` lists rather than rebuilding `_coded` strings
+
+    Returns:
+        Example groups in the format written by make_clásal_coibhneasta.py.
+        Rebuilt `_coded` strings do not carry the template's trailing newline.
+    """
+    lexicon = data["lexicon"]
+    examples = []
+
+    for group in data["groups"]:
+        example_group = []
+
+        for variation in group["variations"]:
+            variation_type, tokens = variation[0], variation[1]
+            slots = dict(group["slots"], **(variation[2] if len(variation) > 2 else {}))
+
+            coded_data: Dict[str, Any] = {
+                key: [lexicon[index] for index in value] for key, value in slots.items()
+            }
+            coded_data["_root"] = lexicon[group["root"]]
+
+            tokens = [lexicon[token] if isinstance(token, int) else token for token in tokens]
+            if tokenised:
+                coded_data["_tokens"] = tokens
+            else:
+                coded_data["_coded"] = "".join(
+                    token if isinstance(token, str)
+                    else f"${{{token[0]}{'R' if token[1] == 2 else ''}}}"
+                    for token in tokens
+                )
+
+            example_group.append([variation_type, coded_data])
+
+        examples.append(example_group)
+
+    return examples
+
+
+def main(command: str, input_file: str, output_file: str):
+    """
+    Convert an examples file between the coded and normalised formats.
+
+    Args:
+        command: "normalise" or "expand"
+        input_file: Path to the JSON file to read
+        output_file: Path to the JSON file to write
+    """
+    with Path(input_file).open(encoding="utf-8") as f:
+        data = json.load(f)
+
+    with Path(output_file).open("w", encoding="utf-8") as f:
+        if command == "normalise":
+            json.dump(normalise_examples(data), f, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump(expand_normalised(data), f, indent=2, ensure_ascii=False)
+
+    print(f"Wrote {output_file}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("normalise", "expand"):
+        print("Usage: python examples_format.py (normalise|expand) <input.json> <output.json>")
+        sys.exit(1)
+
+    main(*sys.argv[1:])
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Draw verb form flashcard shards from a persistent, re-weightable sampler.
+
+Each distinct form (verb name, conjugation and answer) found in existing
+forms-N.json shards becomes one item, weighted by its `multiplier`. The
+sampler state is saved to a file, so multipliers can be tuned (for example
+to emphasise forms learners get wrong) and shard generation then resumes
+from where it stopped, without rebuilding from the shards:
+
+    python forms_sampler.py build forms-state.json ../public/samples/forms-*.json
+    python forms_sampler.py weight forms-state.json "ceannaigh" "Past Pl3 Declar Pos" 36
+    python forms_sampler.py shards forms-state.json ../public/samples 10
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sampling import DynamicWeightedSampler
+
+# Configuration
+SHARD_SIZE = 1000  # Number of entries per forms-N.json shard
+SHARD_COUNT = 1000  # Tab1Page.vue fetches a random forms-N.json with N in [0, SHARD_COUNT)
+
+
+class FormsSampler:
+    """Weighted sampler over distinct verb forms, with the state needed to resume shard generation."""
+
+    def __init__(self, forms: List[List[str]], sampler: DynamicWeightedSampler, next_shard: int = 0):
+        """
+        Initialize the sampler.
+
+        Args:
+            forms: [name, conjugate, answer] for each item
+            sampler: Sampler over the items, weighted by multiplier
+            next_shard: Number of the next shard to write, wrapping round at SHARD_COUNT
+        """
+        self.forms = forms
+        self.sampler = sampler
+        self.next_shard = next_shard
+        self._indices: Dict[tuple, List[int]] = {}
+        for index, (name, conjugate, _) in enumerate(forms):
+            self._indices.setdefault((name, conjugate), []).append(index)
+
+    @classmethod
+    def from_shards(cls, shard_files: List[str], seed: Optional[int] = None) -> "FormsSampler":
+        """
+        Collect the distinct forms of existing shards, weighted by their multipliers.
+
+        Args:
+            shard_files: Paths to forms-N.json files
+            seed: Optional seed for the sampler
+
+        Returns:
+            FormsSampler, whose next shard follows the highest numbered shard given,
+            wrapping round to overwrite the oldest once the app's SHARD_COUNT shards exist
+        """
+        multipliers: Dict[tuple, float] = {}
+        next_shard = 0
+        for shard_file in shard_files:
+            with Path(shard_file).open(encoding="utf-8") as f:
+                for entry in json.load(f):
+                    multipliers[(entry["name"], entry["conjugate"], entry["answer"])] = entry["multiplier"]
+
+            number = Path(shard_file).stem.rpartition("-")[2]
+            if number.isdigit():
+                next_shard = max(next_shard, int(number) + 1)
+
+        forms = [list(form) for form in multipliers]
+        return cls(forms, DynamicWeightedSampler(list(multipliers.values()), seed), next_shard % SHARD_COUNT)
+
+    @classmethod
+    def load(cls, state_file: str) -> "FormsSampler":
+        """Load a sampler saved with `save`."""
+        with Path(state_file).open(encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["forms"], DynamicWeightedSampler.from_dict(data["sampler"]), data["next_shard"])
+
+    def save(self, state_file: str):
+        """Save the sampler, including its random state and next shard number."""
+        data = {"forms": self.forms, "sampler": self.sampler.to_dict(), "next_shard": self.next_shard}
+        with Path(state_file).open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    def set_multiplier(self, name: str, conjugate: str, multiplier: float) -> int:
+        """
+        Change the multiplier of every answer to one conjugation of a verb.
+
+        Args:
+            name: Verb name
+            conjugate: Conjugation, e.g. "Past Pl3 Declar Pos"
+            multiplier: New multiplier
+
+        Returns:
+            Number of items updated
+        """
+        indices = self._indices.get((name, conjugate), [])
+        for index in indices:
+            self.sampler.update(index, multiplier)
+        return len(indices)
+
+    def entry(self, index: int) -> Dict[str, Any]:
+        """Return an item as a shard entry, with its current multiplier."""
+        name, conjugate, answer = self.forms[index]
+        multiplier = self.sampler.weights[index]
+        return {
+            "name": name,
+            "conjugate": conjugate,
+            "answer": answer,
+            "multiplier": int(multiplier) if multiplier.is_integer() else multiplier,
+        }
+
+    def write_shards(self, output_folder: str, count: int, size: int = SHARD_SIZE,
+                     start: Optional[int] = None) -> List[Path]:
+        """
+        Draw and write the next `count` shards, numbered within the app's SHARD_COUNT.
+
+        Args:
+            output_folder: Folder to write forms-N.json files to
+            count: Number of shards
+            size: Number of entries per shard
+            start: Optional number of the first shard, instead of the next one
+
+        Returns:
+            Paths of the shards written
+        """
+        if start is not None:
+            self.next_shard = start % SHARD_COUNT
+
+        written = []
+        for _ in range(count):
+            shard = [self.entry(self.sampler.draw()) for _ in range(size)]
+            path = Path(output_folder) / f"forms-{self.next_shard}.json"
+            with path.open("w", encoding="utf-8") as f:
+                json.dump(shard, f)
+            written.append(path)
+            self.next_shard = (self.next_shard + 1) % SHARD_COUNT
+        return written
+
+
+def main(args: argparse.Namespace):
+    """
+    Run one of the build, weight or shards commands.
+
+    Args:
+        args: Parsed command line arguments
+    """
+    if args.command == "build":
+        forms_sampler = FormsSampler.from_shards(args.shards, args.seed)
+        print(f"Collected {len(forms_sampler.forms)} forms from {len(args.shards)} shards")
+    else:
+        forms_sampler = FormsSampler.load(args.state)
+
+    if args.command == "weight":
+        updated = forms_sampler.set_multiplier(args.name, args.conjugate, args.multiplier)
+        if not updated:
+            print(f"No form {args.name} ({args.conjugate}) in {args.state}")
+            sys.exit(1)
+        print(f"Updated {updated} forms")
+    elif args.command == "shards":
+        written = forms_sampler.write_shards(args.output_folder, args.count, args.size, args.start)
+        print(f"Wrote {written[0].name} to {written[-1].name}" if written else "Wrote no shards")
+
+    forms_sampler.save(args.state)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Draw verb form shards from a persistent weighted sampler.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Create the sampler state from existing shards")
+    build.add_argument("state", help="Sampler state file to write")
+    build.add_argument("shards", nargs="+", help="forms-N.json files")
+    build.add_argument("--seed", type=int, help="Seed for the sampler")
+
+    weight = subparsers.add_parser("weight", help="Change the multiplier of one conjugation of a verb")
+    weight.add_argument("state", help="Sampler state file")
+    weight.add_argument("name", help="Verb name")
+    weight.add_argument("conjugate", help='Conjugation, e.g. "Past Pl3 Declar Pos"')
+    weight.add_argument("multiplier", type=float, help="New multiplier")
+
+    shards = subparsers.add_parser("shards", help="Write the next shards")
+    shards.add_argument("state", help="Sampler state file")
+    shards.add_argument("output_folder", help="Folder to write forms-N.json files to")
+    shards.add_argument("count", type=int, help="Number of shards")
+    shards.add_argument("--size", type=int, default=SHARD_SIZE, help="Number of entries per shard")
+    shards.add_argument("--start", type=int,
+                        help=f"Number of the first shard to write (default: the next one, modulo {SHARD_COUNT})")
+
+    main(parser.parse_args())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Load the Gramadán (BuNaMo) database across several processes.
+
+`Database(data_folder).load()` parses the per-lemma XML files one after
+another. This module splits the files of each subfolder (noun, adjective,
+verb, preposition, ...) into contiguous chunks, loads each chunk with the
+same `Database` class in a worker process, and merges the results in chunk
+order into the `dictionary` structure the generators expect.
+
+Run as a script to benchmark the parallel load against the serial one:
+
+    python gramadan_loader.py /path/to/gramadan/data
+"""
+
+import os
+import sys
+import pickle
+import tempfile
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from gramadan.v2.database import Database
+
+# Chunks per worker, so that slow chunks do not leave other workers idle
+CHUNKS_PER_WORKER = 4
+
+
+def load_database_serial(data_folder: str) -> Dict[str, Any]:
+    """
+    Load the Gramadán database in this process.
+
+    Args:
+        data_folder: Path to the Gramadán data folder
+
+    Returns:
+        Dictionary of grammatical elements
+    """
+    database = Database(data_folder)
+    database.load()
+    return database.dictionary
+
+
+def _make_shards(data_folder: Path, shard_root: Path, chunks: int) -> List[str]:
+    """
+    Build shard folders that mirror the data folder, each linking to one chunk of every subfolder.
+
+    Files directly in the data folder are linked into every shard, and every
+    shard gets every subfolder, even when its chunk of that subfolder is empty.
+
+    Args:
+        data_folder: Path to the Gramadán data folder
+        shard_root: Empty folder to build the shards in
+        chunks: Number of shards
+
+    Returns:
+        Paths of the shard folders, in merge order
+    """
+    shards = [shard_root / str(index) for index in range(chunks)]
+    for shard in shards:
+        shard.mkdir()
+
+    for entry in sorted(data_folder.iterdir()):
+        if not entry.is_dir():
+            for shard in shards:
+                (shard / entry.name).symlink_to(entry.resolve())
+            continue
+
+        files = sorted(entry.iterdir())
+        size = -(-len(files) // chunks)  # Ceiling division
+        for index, shard in enumerate(shards):
+            subfolder = shard / entry.name
+            subfolder.mkdir()
+            for path in files[index * size:(index + 1) * size]:
+                (subfolder / path.name).symlink_to(path.resolve())
+
+    return [str(shard) for shard in shards]
+
+
+def _merge(dictionaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge the dictionaries loaded from each shard, in shard order.
+
+    Args:
+        dictionaries: Loaded dictionaries, one per shard
+
+    Returns:
+        Dictionary of grammatical elements
+    """
+    merged: Dict[str, Any] = {}
+    for dictionary in dictionaries:
+        for category, entries in dictionary.items():
+            if category not in merged:
+                merged[category] = type(entries)()
+            if isinstance(entries, dict):
+                merged[category].update(entries)
+            else:
+                merged[category].extend(entries)
+    return merged
+
+
+def load_database(data_folder: str, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Load the Gramadán database, parsing the XML files in a pool of processes.
+
+    Args:
+        data_folder: Path to the Gramadán data folder
+        workers: Number of processes, defaulting to the CPU count; 1 loads serially
+
+    Returns:
+        Dictionary of grammatical elements, matching `load_database_serial`
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return load_database_serial(data_folder)
+
+    with tempfile.TemporaryDirectory(prefix="gramadan-shards-") as shard_root:
+        shards = _make_shards(Path(data_folder), Path(shard_root), workers * CHUNKS_PER_WORKER)
+        with Pool(workers) as pool:
+            dictionaries = pool.map(load_database_serial, shards)
+
+    return _merge(dictionaries)
+
+
+def _entries(dictionary: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """
+    Serialise each entry of a loaded dictionary, in order, so that two loads can be compared.
+
+    Args:
+        dictionary: Dictionary of grammatical elements
+
+    Returns:
+        For each category, (key, pickled entry) pairs for a dict, or pickled entries for a list
+    """
+    return {
+        category: [(key, pickle.dumps(value)) for key, value in entries.items()]
+        if isinstance(entries, dict) else [pickle.dumps(value) for value in entries]
+        for category, entries in dictionary.items()
+    }
+
+
+def main(data_folder: str):
+    """
+    Benchmark parallel loading against serial loading for increasing worker counts.
+
+    Args:
+        data_folder: Path to the Gramadán data folder
+    """
+    start = time.perf_counter()
+    serial = load_database_serial(data_folder)
+    serial_time = time.perf_counter() - start
+    print(f"Serial load: {serial_time:.2f}s")
+    for category, entries in serial.items():
+        print(f"  {category}: {len(entries)} entries")
+    serial_entries = _entries(serial)
+
+    counts = sorted({2 ** power for power in range((os.cpu_count() or 1).bit_length())} | {os.cpu_count() or 1})
+    print(f"{'Workers':>8} {'Time':>8} {'Speed-up':>9}  Result")
+    for workers in counts:
+        start = time.perf_counter()
+        parallel = load_database(data_folder, workers)
+        elapsed = time.perf_counter() - start
+
+        parallel_entries = _entries(parallel)
+        if parallel_entries == serial_entries:
+            result = "identical"
+        elif {key: sorted(value) for key, value in parallel_entries.items()} == \
+                {key: sorted(value) for key, value in serial_entries.items()}:
+            result = "same entries, different order"
+        else:
+            result = "DIFFERENT"
+
+        print(f"{workers:>8} {elapsed:>7.2f}s {serial_time / elapsed:>8.2f}x  {result}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python gramadan_loader.py <gramadan_data_folder>")
+        sys.exit(1)
+
+    main(sys.argv[1])
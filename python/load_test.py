@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Load test the generated card data as the PWA fetches it.
+
+This script serves the static files from a local HTTP server in its own
+process, under the app's /flashpwa/ base path, looking in public/ first and
+then the project root, as the Vite dev server does. Many concurrent asyncio
+clients then replay the app's fetches for each data layout:
+
+    forms:      Tab1Page.vue, one random samples/forms-N.json shard
+    examples:   Tab3Page.vue, the whole examples.json
+    adjectives: Tab2Page.vue, python/adjectives.json
+
+For each layout it reports latency percentiles, bytes transferred (and their
+gzipped size, as a CDN would serve them) and JSON decode time. Compare other
+output formats by adding layouts:
+
+    python load_test.py --layout lexicon=examples-lexicon.json --clients 100
+"""
+
+import sys
+import gzip
+import json
+import time
+import random
+import asyncio
+import argparse
+import multiprocessing
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Configuration
+BASE_PATH = "/flashpwa/"
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_ROOTS = [PROJECT_ROOT / "public", PROJECT_ROOT]
+DEFAULT_LAYOUTS = {
+    "forms": "samples/forms-*.json",
+    "examples": "examples.json",
+    "adjectives": "python/adjectives.json",
+}
+PERCENTILES = (50, 90, 99)
+LISTEN_BACKLOG = 1024  # Pending connections the server accepts, well above --clients
+
+
+class StaticHandler(SimpleHTTPRequestHandler):
+    """Serves files under BASE_PATH from the first root that has them, with keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+    # Without this, small responses on a kept-alive connection wait on the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def __init__(self, *args, roots: List[Path], **kwargs):
+        self.roots = roots
+        super().__init__(*args, directory=str(roots[0]), **kwargs)
+
+    def translate_path(self, path: str) -> str:
+        path = path.split("?", 1)[0]
+        if not path.startswith(BASE_PATH):
+            return str(self.roots[0] / "__missing__")
+
+        relative = path[len(BASE_PATH):]
+        for root in self.roots:
+            candidate = (root / relative).resolve()
+            if candidate.is_relative_to(root.resolve()) and candidate.is_file():
+                return str(candidate)
+        return str(self.roots[0] / relative)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StaticServer(ThreadingHTTPServer):
+    """Threading server whose listen backlog takes every client connecting at once."""
+
+    request_queue_size = LISTEN_BACKLOG
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that time out drop their connection mid-response, which is already counted
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve(roots: List[Path], ports: multiprocessing.Queue):
+    """
+    Run the static server on a free local port until the process is terminated.
+
+    Args:
+        roots: Folders to serve, searched in order
+        ports: Queue the server's port is put on once it is listening
+    """
+    server = StaticServer(("127.0.0.1", 0), partial(StaticHandler, roots=roots))
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_server(roots: List[Path]) -> Tuple[multiprocessing.Process, int]:
+    """
+    Start the static server in its own process, so it does not share a GIL with the clients.
+
+    Args:
+        roots: Folders to serve, searched in order
+
+    Returns:
+        The server process and the port it listens on
+    """
+    ports: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(roots, ports), daemon=True)
+    process.start()
+    return process, ports.get()
+
+
+def resolve_layout(roots: List[Path], pattern: str) -> List[str]:
+    """
+    Find the files a layout fetches.
+
+    Args:
+        roots: Folders to serve, searched in order
+        pattern: Glob relative to the roots
+
+    Returns:
+        Relative paths, first root winning where several have the same file
+    """
+    found: Dict[str, None] = {}
+    for root in roots:
+        for path in sorted(root.glob(pattern)):
+            if path.is_file():
+                found.setdefault(path.relative_to(root).as_posix(), None)
+    return list(found)
+
+
+async def fetch(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                port: int, path: str) -> Tuple[int, bytes]:
+    """
+    Send one GET request on an open keep-alive connection and read the response.
+
+    Returns:
+        (status, body), with status 0 if the server closed the connection
+    """
+    writer.write(
+        f"GET {BASE_PATH}{path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+        f"Accept: application/json\r\n\r\n".encode("utf-8")
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        return 0, b""
+    status = int(status_line.split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, body
+
+
+async def client(port: int, paths: List[str], requests: int, timeout: float,
+                 results: List[Tuple[str, int, float, int]]):
+    """
+    Replay `requests` app loads over one connection, each fetching a random file of the layout.
+
+    Appends (path, status, latency, bytes) to `results`. A request that fails to
+    connect, is cut off or takes longer than `timeout` seconds is recorded with
+    status 0, and the next request opens a new connection.
+    """
+    writer = None
+    for _ in range(requests):
+        path = random.choice(paths)
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+            status, body = await asyncio.wait_for(fetch(reader, writer, port, path), timeout)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            status, body = 0, b""
+        results.append((path, status, time.perf_counter() - start, len(body)))
+
+        if not status and writer is not None:
+            # The connection is closed or in an unknown state, so reconnect for the next request
+            writer.close()
+            writer = None
+
+    if writer is not None:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    rank = max(0, min(len(values) - 1, round(percent / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def decode_time(file_path: Path, repeats: int) -> float:
+    """Mean time to decode the file's JSON, in seconds."""
+    data = file_path.read_bytes()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        json.loads(data)
+    return (time.perf_counter() - start) / repeats
+
+
+def run_layout(name: str, pattern: str, roots: List[Path], port: int,
+               clients: int, requests: int, timeout: float, decode_repeats: int):
+    """Load test one layout and print its report line."""
+    paths = resolve_layout(roots, pattern)
+    if not paths:
+        print(f"{name:<12} no files match {pattern}")
+        return
+
+    results: List[Tuple[str, int, float, int]] = []
+
+    async def run_clients():
+        await asyncio.gather(*(client(port, paths, requests, timeout, results) for _ in range(clients)))
+
+    start = time.perf_counter()
+    asyncio.run(run_clients())
+    elapsed = time.perf_counter() - start
+
+    errors = sum(1 for _, status, _, _ in results if status != 200)
+    latencies = sorted(latency for _, _, latency, _ in results)
+    transferred = sum(size for _, _, _, size in results)
+
+    # Gzipped sizes and decode times are per file, weighted by how often each was fetched
+    files = {path: next(root / path for root in roots if (root / path).is_file()) for path in paths}
+    fetched = [path for path, status, _, _ in results if status == 200]
+    gzipped = {path: len(gzip.compress(files[path].read_bytes())) for path in set(fetched)}
+    decoded = {path: decode_time(files[path], decode_repeats) for path in set(fetched)}
+    mean_decode = sum(decoded[path] for path in fetched) / max(1, len(fetched))
+
+    latency_columns = " ".join(f"{percentile(latencies, p) * 1000:>7.1f}" for p in PERCENTILES)
+    print(f"{name:<12} {len(results):>6} {errors:>6} {len(results) / elapsed:>8.0f} {latency_columns} "
+          f"{transferred / 1e6:>9.2f} {sum(gzipped[path] for path in fetched) / 1e6:>9.2f} "
+          f"{mean_decode * 1000:>9.2f}")
+
+
+def main(roots: List[Path], layouts: Dict[str, str], clients: int, requests: int,
+         timeout: float, decode_repeats: int):
+    """
+    Serve the roots and load test each layout in turn.
+
+    Args:
+        roots: Folders to serve, searched in order
+        layouts: Layout names mapped to the glob of files each app load picks from
+        clients: Number of concurrent clients
+        requests: Number of app loads per client
+        timeout: Seconds before a request counts as an error
+        decode_repeats: Number of times each file is decoded to time it
+    """
+    server, port = start_server(roots)
+    print(f"Serving {', '.join(str(root) for root in roots)} at http://127.0.0.1:{port}{BASE_PATH}")
+    print(f"{clients} clients x {requests} requests per layout")
+
+    latency_headers = " ".join(f"{f'p{p} ms':>7}" for p in PERCENTILES)
+    print(f"{'Layout':<12} {'Reqs':>6} {'Errors':>6} {'Req/s':>8} {latency_headers} "
+          f"{'MB':>9} {'MB gzip':>9} {'Decode ms':>9}")
+    try:
+        for name, pattern in layouts.items():
+            run_layout(name, pattern, roots, port, clients, requests, timeout, decode_repeats)
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the PWA's generated card data.")
+    parser.add_argument("--root", action="append", type=Path, dest="roots",
+                        help="Folder to serve under /flashpwa/, may be repeated "
+                             "(default: public/ then the project root)")
+    parser.add_argument("--layout", action="append", default=[], metavar="NAME=GLOB",
+                        help="Add a layout whose app load fetches a random file matching GLOB")
+    parser.add_argument("--only", action="store_true",
+                        help="Test only the --layout layouts, not the default ones")
+    parser.add_argument("--clients", type=int, default=50, help="Number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=20, help="Number of app loads per client")
+    parser.add_argument("--timeout", type=float, default=30,
+                        help="Seconds before a request counts as an error")
+    parser.add_argument("--decode-repeats", type=int, default=5,
+                        help="Number of times each file is decoded to time it")
+    args = parser.parse_args()
+
+    layouts = {} if args.only else dict(DEFAULT_LAYOUTS)
+    for layout in args.layout:
+        name, separator, pattern = layout.partition("=")
+        if not separator:
+            print(f"Layouts are given as NAME=GLOB, not {layout}")
+            sys.exit(1)
+        layouts[name] = pattern
+
+    main(args.roots or DEFAULT_ROOTS, layouts, args.clients, args.requests, args.timeout, args.decode_repeats)
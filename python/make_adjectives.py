@@ -6,12 +6,13 @@ This script creates grammatical variations of Irish adjective phrases showing
 mutation patterns for articles, nouns, and adjectives in different contexts.
 """
 
-import sys
 import json
 import re
+import argparse
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple, Literal
-from random import choice, randint
+from typing import Dict, List, Any, Iterable, Optional, Tuple, Literal
+from random import choice, randint, sample
+from multiprocessing import Pool
 
 # Gramadán imports for Irish language processing
 from gramadan.v2.noun import Noun
@@ -19,13 +20,35 @@ from gramadan.v2.adjective import Adjective
 from gramadan.v2.preposition import Preposition
 from gramadan.features import Number
 from gramadan.v2.features import Case, Article, System
-from gramadan.v2.database import Database
+
+from dedup import DedupIndex
+from gramadan_loader import load_database
 
 # Configuration
 SAMPLES = 5  # Number of examples to generate (reduced for testing)
+MAX_ATTEMPTS_PER_SAMPLE = 10  # Give up once count * this many combinations have been tried
 EXAMPLES_INPUT_FILE = "examples.txt"
 ADJECTIVES_OUTPUT_FILE = "adjectives.json"
 
+# Common Irish prepositions that cause mutations
+MUTATION_PREFIXES = [
+    "i ndiaidh",  # after
+    "in aice",    # beside
+    "os comhair", # in front of
+    "ar feadh",   # for (duration)
+    "de bharr",   # because of
+    "i gcóir",    # for/towards
+    None,         # no prefix (genitive case)
+]
+
+# Every (prefix, with_article, is_plural) variant of a noun/adjective pair
+ALL_VARIANTS = [
+    (prefix, with_article, is_plural)
+    for prefix in MUTATION_PREFIXES
+    for with_article in (True, False)
+    for is_plural in (False, True)
+]
+
 
 class AdjectiveExample:
     """Represents a single adjective mutation example."""
@@ -64,17 +87,66 @@ class AdjectiveExample:
         }
 
 
+class NounAdjectivePair:
+    """
+    Forms shared by every variant of one noun/adjective pair.
+
+    The noun phrase is built once, and its base, genitive and prepositional
+    forms are inflected on first use and reused, so the prefix, article and
+    number variants of a pair only pay for the inflection they actually need.
+    """
+
+    def __init__(self, noun: Noun, adjective: Adjective):
+        self.noun = noun
+        self.adjective = adjective
+        self.noun_phrase = noun + adjective
+        self._base_forms: Dict[Number, Tuple[str, str]] = {}
+        self._genitive_forms: Dict[Tuple[Number, Article], Optional[str]] = {}
+        self._prepositional_phrases: Dict[str, Any] = {}
+        self._prepositional_forms: Dict[Tuple[str, Number, Article], str] = {}
+
+    def base_forms(self, number: Number) -> Tuple[str, str]:
+        """Nominative noun and adjective forms, without the article."""
+        if number not in self._base_forms:
+            self._base_forms[number] = (
+                self.noun.to(Case.Nom, number, Article.NoArt)[0].value,
+                self.adjective.to(Case.Nom, number, Article.NoArt)[0].value,
+            )
+        return self._base_forms[number]
+
+    def genitive_form(self, number: Number, article_type: Article) -> Optional[str]:
+        """Genitive form of the noun phrase, or None if it has none."""
+        key = (number, article_type)
+        if key not in self._genitive_forms:
+            attempt_mutation = self.noun_phrase.to(Case.Gen, number, article_type)
+            self._genitive_forms[key] = attempt_mutation[0].value if attempt_mutation else None
+        return self._genitive_forms[key]
+
+    def prepositional_form(self, prefix: str, preposition: Preposition,
+                           number: Number, article_type: Article) -> str:
+        """Form of the noun phrase after `preposition`, whose dictionary key is `prefix`."""
+        key = (prefix, number, article_type)
+        if key not in self._prepositional_forms:
+            if prefix not in self._prepositional_phrases:
+                self._prepositional_phrases[prefix] = preposition + self.noun_phrase
+            phrase = self._prepositional_phrases[prefix]
+            self._prepositional_forms[key] = phrase.to(number, article_type)[0].value
+        return self._prepositional_forms[key]
+
+
 class AdjectiveGenerator:
     """Generates Irish adjective mutation examples."""
     
-    def __init__(self, dictionaries: Dict[str, Any]):
+    def __init__(self, dictionaries: Dict[str, Any], verbose: bool = False):
         """
         Initialize the generator with grammatical dictionaries.
         
         Args:
             dictionaries: Dictionary containing noun, adjective, and preposition data
+            verbose: Print the forms extracted for each example
         """
         self.dictionaries = dictionaries
+        self.verbose = verbose
         self.nouns = list(dictionaries["noun"].keys())
         self.adjectives = list(dictionaries["adjective"].keys())
         self.prepositions = list(dictionaries["preposition"].keys())
@@ -148,16 +220,92 @@ class AdjectiveGenerator:
         Returns:
             AdjectiveExample object
         """
-        noun = self.dictionaries["noun"][noun_key]
-        adjective = self.dictionaries["adjective"][adjective_key]
+        pair = NounAdjectivePair(
+            self.dictionaries["noun"][noun_key],
+            self.dictionaries["adjective"][adjective_key]
+        )
+        return self._build_example(pair, adjective_key, prefix, with_article, is_plural)
+    
+    def generate_variants(self, noun_key: str, adjective_key: str,
+                          variants: Optional[Iterable[Tuple[Optional[str], bool, bool]]] = None
+                          ) -> List[AdjectiveExample]:
+        """
+        Generate several variants of one noun/adjective pair, sharing the work between them.
+        
+        Args:
+            noun_key: Key for noun in dictionary
+            adjective_key: Key for adjective in dictionary
+            variants: (prefix, with_article, is_plural) tuples, defaulting to ALL_VARIANTS
+            
+        Returns:
+            List of AdjectiveExample objects, skipping variants that have no genitive form
+        """
+        pair = NounAdjectivePair(
+            self.dictionaries["noun"][noun_key],
+            self.dictionaries["adjective"][adjective_key]
+        )
+        examples = []
+        for prefix, with_article, is_plural in (ALL_VARIANTS if variants is None else variants):
+            if (example := self._build_example(
+                pair, adjective_key, prefix, with_article, is_plural
+            )):
+                examples.append(example)
+        return examples
+    
+    def generate_variant_tables(self, pairs: Iterable[Tuple[str, str]],
+                                variants: Optional[List[Tuple[Optional[str], bool, bool]]] = None,
+                                workers: Optional[int] = None,
+                                dedup: Optional[DedupIndex] = None) -> List[AdjectiveExample]:
+        """
+        Generate variants for many noun/adjective pairs on a pool of worker processes.
         
+        Args:
+            pairs: (noun_key, adjective_key) tuples
+            variants: (prefix, with_article, is_plural) tuples, defaulting to ALL_VARIANTS
+            workers: Number of processes, defaulting to the CPU count; 1 runs in this process
+            dedup: Optional index of examples already generated, checked before dispatching
+            
+        Returns:
+            List of AdjectiveExample objects, grouped by pair in the order given
+        """
+        tasks = []
+        for noun_key, adjective_key in pairs:
+            chosen = [
+                variant for variant in (ALL_VARIANTS if variants is None else variants)
+                if dedup is None or dedup.add("adjective", noun_key, adjective_key, *variant)
+            ]
+            if chosen:
+                tasks.append((noun_key, adjective_key, chosen))
+        
+        if workers == 1:
+            results = [self.generate_variants(*task) for task in tasks]
+        else:
+            with Pool(workers, initializer=_init_worker,
+                      initargs=(self.dictionaries, self.verbose)) as pool:
+                results = pool.map(_generate_variants_worker, tasks, chunksize=16)
+        
+        return [example for examples in results for example in examples]
+    
+    def _build_example(self, pair: NounAdjectivePair, adjective_key: str,
+                       prefix: Optional[str], with_article: bool,
+                       is_plural: bool) -> AdjectiveExample | Literal[False]:
+        """
+        Build one variant of a noun/adjective pair from its shared forms.
+        
+        Args:
+            pair: Shared forms of the noun/adjective pair
+            adjective_key: Key for adjective in dictionary
+            prefix: Optional preposition or prefix
+            with_article: Whether to include definite article
+            is_plural: Whether to use plural form
+            
+        Returns:
+            AdjectiveExample object, or False if the phrase has no genitive form
+        """
         # Determine forms
         number = Number.Pl if is_plural else Number.Sg
         article_type = Article.Art if with_article else Article.NoArt
         
-        # Base forms (nominative)
-        noun_phrase = noun + adjective
-        
         # Get constituent parts
         article_base = ""
         article_mut = ""
@@ -167,31 +315,14 @@ class AdjectiveGenerator:
             else:
                 article_base = article_mut = "an"
         
-        # Handle preposition and get the proper mutated form
-        prep_prefix = ""
-        if prefix and prefix in self.dictionaries["preposition"]:
-            prep = self.dictionaries["preposition"][prefix]
-            prep_phrase = prep + noun_phrase
-            mutated_form = prep_phrase.to(number, article_type)[0].value
-            prep_prefix = prefix
-            # Also get the noun phrase without preposition for mutation analysis
-            attempt_mutation = noun_phrase.to(Case.Gen, number, article_type)
-            if not attempt_mutation:
-                return False
-            noun_phrase_mutated = attempt_mutation[0].value
-        else:
-            if prefix:
-                prep_prefix = prefix
-            # Use genitive for mutation example
-            attempt_mutation = noun_phrase.to(Case.Gen, number, article_type)
-            if not attempt_mutation:
-                return False
-            mutated_form = attempt_mutation[0].value
-            noun_phrase_mutated = mutated_form
+        # The genitive noun phrase (without preposition) is used for mutation analysis
+        prep_prefix = prefix or ""
+        noun_phrase_mutated = pair.genitive_form(number, article_type)
+        if noun_phrase_mutated is None:
+            return False
         
         # Extract base noun and adjective forms
-        base_noun_form = noun.to(Case.Nom, number, Article.NoArt)[0].value
-        base_adj_form = adjective.to(Case.Nom, number, Article.NoArt)[0].value
+        base_noun_form, base_adj_form = pair.base_forms(number)
         
         # Extract mutated components from the noun phrase (without preposition)
         # Remove any article prefix from mutated form for analysis
@@ -221,7 +352,13 @@ class AdjectiveGenerator:
             mut_adj_candidate = base_adj_form
         
         # Debug output to verify extraction
-        if __debug__:
+        if self.verbose:
+            # Full form, including the preposition where it is a known one
+            mutated_form = noun_phrase_mutated
+            if prefix and prefix in self.dictionaries["preposition"]:
+                mutated_form = pair.prepositional_form(
+                    prefix, self.dictionaries["preposition"][prefix], number, article_type
+                )
             print(f"Debug: Base noun='{base_noun_form}', adj='{base_adj_form}'")
             print(f"Debug: Full mutated='{mutated_form}'")
             print(f"Debug: Noun phrase mutated='{noun_phrase_mutated}'")
@@ -248,36 +385,36 @@ class AdjectiveGenerator:
             adj_mut_back=adj_mut_back
         )
     
-    def generate_random_examples(self, count: int) -> List[AdjectiveExample]:
+    def generate_random_examples(self, count: int,
+                                 dedup: Optional[DedupIndex] = None) -> List[AdjectiveExample]:
         """
-        Generate a list of random adjective examples.
+        Generate a list of random, distinct adjective examples.
         
         Args:
             count: Number of examples to generate
+            dedup: Optional index of examples already generated, e.g. by earlier runs
             
         Returns:
             List of AdjectiveExample objects
         """
         examples = []
+        if dedup is None:
+            dedup = DedupIndex()
         
-        # Common Irish prepositions that cause mutations
-        mutation_prefixes = [
-            "i ndiaidh",  # after
-            "in aice",    # beside
-            "os comhair", # in front of
-            "ar feadh",   # for (duration)
-            "de bharr",   # because of
-            "i gcóir",    # for/towards
-            None,         # no prefix (genitive case)
-        ]
-        
-        while len(examples) < count:
+        for _ in range(count * MAX_ATTEMPTS_PER_SAMPLE):
+            if len(examples) >= count:
+                break
+
             # Select random components
             noun_key = choice(self.nouns)
             adj_key = choice(self.adjectives)
-            prefix = choice(mutation_prefixes)
+            prefix = choice(MUTATION_PREFIXES)
             with_article = choice([True, False])
             is_plural = choice([True, False])
+
+            # Drop repeats (and combinations that failed before) without inflecting
+            if not dedup.add("adjective", noun_key, adj_key, prefix, with_article, is_plural):
+                continue
             
             if (example := self.generate_example(
                 noun_key, adj_key, prefix, with_article, is_plural
@@ -287,38 +424,66 @@ class AdjectiveGenerator:
         return examples
 
 
-def load_gramadan_database(data_folder: str) -> Dict[str, Any]:
+# Generator used by worker processes of `AdjectiveGenerator.generate_variant_tables`
+_worker_generator: Optional[AdjectiveGenerator] = None
+
+
+def _init_worker(dictionaries: Dict[str, Any], verbose: bool):
+    """Create the generator for this worker process."""
+    global _worker_generator
+    _worker_generator = AdjectiveGenerator(dictionaries, verbose)
+
+
+def _generate_variants_worker(task: Tuple[str, str, List[Tuple[Optional[str], bool, bool]]]) -> List[AdjectiveExample]:
+    """Generate the chosen variants of one noun/adjective pair in a worker process."""
+    return _worker_generator.generate_variants(*task)
+
+
+def load_gramadan_database(data_folder: str, workers: Optional[int] = 1) -> Dict[str, Any]:
     """
     Load the Gramadán database containing Irish language data.
     
     Args:
         data_folder: Path to the Gramadán data folder
+        workers: Number of processes to parse the XML files in (None for one per CPU)
         
     Returns:
         Dictionary of grammatical elements
     """
-    database = Database(data_folder)
-    database.load()
-    return database.dictionary
+    return load_database(data_folder, workers)
 
 
-def main(data_folder: str):
+def main(data_folder: str, dedup_index: Optional[str] = None, workers: Optional[int] = 1,
+         exhaustive: bool = False, verbose: bool = False):
     """
     Main function to generate adjective examples.
     
     Args:
         data_folder: Path to the Gramadán data folder
+        dedup_index: Optional file recording examples from earlier runs, so they are not repeated
+        workers: Number of processes to load the database and build tables with (None for one per CPU)
+        exhaustive: Generate every variant of SAMPLES noun/adjective pairs, not SAMPLES random examples
+        verbose: Print the forms extracted for each example
     """
     # Load grammatical data
     print("Loading Gramadán database...")
-    dictionaries = load_gramadan_database(data_folder)
+    dictionaries = load_gramadan_database(data_folder, workers)
     
     # Initialize generator
-    generator = AdjectiveGenerator(dictionaries)
+    generator = AdjectiveGenerator(dictionaries, verbose)
     
     # Generate examples
-    print(f"Generating {SAMPLES} adjective examples...")
-    examples = generator.generate_random_examples(SAMPLES)
+    dedup = DedupIndex(dedup_index)
+    if exhaustive:
+        print(f"Generating all variants for {SAMPLES} noun/adjective pairs...")
+        pairs = zip(sample(generator.nouns, SAMPLES),
+                    [choice(generator.adjectives) for _ in range(SAMPLES)])
+        examples = generator.generate_variant_tables(pairs, workers=workers, dedup=dedup)
+    else:
+        print(f"Generating {SAMPLES} adjective examples...")
+        examples = generator.generate_random_examples(SAMPLES, dedup)
+    if dedup_index:
+        dedup.save()
     
     if not examples:
         print("No examples generated!")
@@ -346,9 +511,20 @@ def main(data_folder: str):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python make_adjectives.py <gramadan_data_folder>")
-        print("Example: python make_adjectives.py /path/to/gramadan/data")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Generate Irish adjective mutation examples.",
+        epilog="Example: python make_adjectives.py /path/to/gramadan/data"
+    )
+    parser.add_argument("data_folder", help="Path to the Gramadán data folder")
+    parser.add_argument("--dedup-index", metavar="PATH",
+                        help="File of previously generated examples to skip, updated after the run")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes to load the Gramadán database and build tables with (0 for one per CPU)")
+    parser.add_argument("--exhaustive", action="store_true",
+                        help="Generate every prefix, article and number variant of SAMPLES noun/adjective pairs")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Print the forms extracted for each example")
+    args = parser.parse_args()
     
-    main(sys.argv[1])
+    main(args.data_folder, dedup_index=args.dedup_index, workers=args.workers or None,
+         exhaustive=args.exhaustive, verbose=args.verbose)
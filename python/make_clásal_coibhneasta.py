@@ -6,9 +6,9 @@ This script creates grammatical variations of Irish sentences containing relativ
 generating both direct and indirect relative clause forms from template sentences.
 """
 
-import sys
 import json
 import re
+import argparse
 from random import randint, choice, choices
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
@@ -26,13 +26,18 @@ from gramadan.v2.verb import VPTense, VPShape, VPPolarity, VPPerson
 from gramadan.verb import VerbPerson
 from gramadan.v2.cnp import CNP
 from gramadan.v2.features import Case, Article, System, Gender
-from gramadan.v2.database import Database
+
+from examples_format import tokenise_variation, normalise_examples
+from dedup import DedupIndex
+from gramadan_loader import load_database
+from sampling import AliasTable
 
 # Initialize colorama for colored terminal output
 init()
 
 # Configuration
 SAMPLES = 1000  # Number of examples to generate
+MAX_ATTEMPTS = SAMPLES * 10  # Give up once this many templates have been tried
 EXAMPLES_INPUT_FILE = "examples-cc.txt"
 EXAMPLES_OUTPUT_FILE = "examples.json"
 
@@ -47,6 +52,80 @@ class ComplexPreposition:
         return self.phrase
 
 
+class NounFeatureIndex:
+    """
+    Noun keys grouped by gender, plural availability and inherent definiteness.
+
+    Built once from the noun dictionary, so that a noun with the wanted
+    features can be drawn directly rather than drawn uniformly and then
+    downgraded (a singular instead of a missing plural, say). Each noun's
+    gender and definiteness are kept, so they need not be asked again.
+    """
+
+    def __init__(self, nouns: Dict[str, Noun]):
+        """
+        Build the buckets and, for every gender and combination of wanted
+        features, an alias table over the buckets that satisfy it.
+
+        Args:
+            nouns: Noun dictionary, keyed as in the Gramadán database
+        """
+        # Noun key -> (gender, has_plural, always_definite)
+        self.features: Dict[str, Tuple[Gender, bool, bool]] = {}
+        # (gender, has_plural, always_definite) -> noun keys
+        self.buckets: Dict[Tuple[Gender, bool, bool], List[str]] = {}
+        for key, noun in nouns.items():
+            noun_phrase = NP.create_from_noun(noun)
+            features = (noun_phrase.getGender(), bool(noun.plNom), bool(noun_phrase.isDefinite))
+            self.features[key] = features
+            self.buckets.setdefault(features, []).append(key)
+
+        # (plural, definite, gender) -> (eligible buckets, alias table weighted by bucket size)
+        self._tables: Dict[Tuple[bool, bool, Gender], Tuple[List[List[str]], AliasTable]] = {}
+        # (plural, definite) -> genders that have a noun taking those features
+        self._genders: Dict[Tuple[bool, bool], List[Gender]] = {}
+        for plural in (True, False):
+            for definite in (True, False):
+                self._genders[(plural, definite)] = []
+                for gender in sorted({features[0] for features in self.buckets}, key=str):
+                    eligible = [
+                        keys for (bucket_gender, has_plural, always_definite), keys in self.buckets.items()
+                        if (has_plural or not plural)
+                        and (definite or not always_definite)
+                        and bucket_gender == gender
+                    ]
+                    if eligible:
+                        self._tables[(plural, definite, gender)] = \
+                            (eligible, AliasTable([len(keys) for keys in eligible]))
+                        self._genders[(plural, definite)].append(gender)
+
+    def genders(self, plural: bool, definite: bool) -> List[Gender]:
+        """Return the genders that have at least one noun able to take the given features."""
+        return self._genders[(plural, definite)]
+
+    def sample(self, plural: bool, definite: bool, gender: Optional[Gender] = None) -> str:
+        """
+        Draw a noun key uniformly from the nouns of one gender that can take the given features.
+
+        Args:
+            plural: Whether the noun will be used in the plural
+            definite: Whether the noun will be definite (if not, inherently definite nouns are excluded)
+            gender: Gender the noun must have, by default one of `genders(plural, definite)`
+                chosen with equal probability
+
+        Returns:
+            Noun key
+        """
+        if gender is None and self._genders[(plural, definite)]:
+            gender = choice(self._genders[(plural, definite)])
+        if (plural, definite, gender) not in self._tables:
+            raise ValueError(f"No noun has features plural={plural}, definite={definite}, gender={gender}")
+
+        eligible, table = self._tables[(plural, definite, gender)]
+        keys = eligible[table.draw()]
+        return keys[randint(0, len(keys) - 1)]
+
+
 class RelativeClauseGenerator:
     """Generates Irish relative clause variations from template sentences."""
 
@@ -58,7 +137,7 @@ class RelativeClauseGenerator:
             dictionaries: Dictionary containing verb, noun, and preposition data
         """
         self.dictionaries = dictionaries
-        self.nouns = list(dictionaries["noun"])
+        self.noun_index = NounFeatureIndex(dictionaries["noun"])
 
     def parse_template_line(self, line: str) -> Tuple[List[str], str, set, set]:
         """
@@ -96,18 +175,28 @@ class RelativeClauseGenerator:
 
         return words, verb, direct_symbols, indirect_symbols
 
-    def _select_random_nouns(self, symbols: List[str]) -> List[Tuple[str, Noun]]:
+    def _choose_noun_features(self, symbols: List[str]) -> List[Tuple[str, str, bool, bool]]:
         """
-        Assign random nouns to placeholder symbols.
+        Choose the nouns and features for placeholder symbols, without inflecting them.
 
         Args:
             symbols: List of placeholder symbols
 
         Returns:
-            List of (symbol, noun) tuples
+            List of (symbol, noun_key, definite, plural) tuples
         """
-        return [(sym, self.dictionaries["noun"][choice(self.nouns)]) 
-                for sym in symbols]
+        symbols = list(symbols)
+        symbols.reverse()  # Process in reverse order for some reason (legacy behavior)
+
+        # Generate variations: first always definite, others random
+        definite_choices = [True] + [choice([True, False]) for _ in symbols[1:]]
+        plural_choices = [choice([True, False]) for _ in symbols]
+
+        # Draw each noun from those that can take its features, with either gender equally likely
+        return [
+            (symbol, self.noun_index.sample(plural, definite), definite, plural)
+            for symbol, definite, plural in zip(symbols, definite_choices, plural_choices)
+        ]
 
     def _process_direct_objects(self, direct_symbols: List[Tuple[str, Noun]], 
                                line: str, line_code: str, 
@@ -208,30 +297,24 @@ class RelativeClauseGenerator:
 
         return line, line_code, line_coded, subject, subject_id, shape
 
-    def _prepare_noun_phrases(self, symbols: List[str], is_indirect: bool = False) -> List[Tuple]:
+    def _prepare_noun_phrases(self, noun_choices: List[Tuple[str, str, bool, bool]],
+                              is_indirect: bool = False) -> List[Tuple]:
         """
         Prepare noun phrases with grammatical variations.
 
         Args:
-            symbols: List of placeholder symbols
+            noun_choices: (symbol, noun_key, definite, plural) tuples from `_choose_noun_features`
             is_indirect: Whether these are indirect objects (with prepositions)
 
         Returns:
             List of tuples containing processed noun phrase data
         """
-        nouns = self._select_random_nouns(list(symbols))
-        nouns.reverse()  # Process in reverse order for some reason (legacy behavior)
-
         result = []
 
-        # Generate variations: first always definite, others random
-        definite_choices = [True] + [choice([True, False]) for _ in nouns[1:]]
-        plural_choices = [choice([True, False]) for _ in nouns]
-
-        for (symbol, noun), definite, plural in zip(nouns, definite_choices, plural_choices):
+        for symbol, noun_key, definite, plural in noun_choices:
             # Create noun phrase
-            if not noun.plNom:
-                plural = False
+            noun = self.dictionaries["noun"][noun_key]
+            gender, _, always_definite = self.noun_index.features[noun_key]
             number = Number.Pl if plural else Number.Sg
             noun_phrase = NP.create_from_noun(noun)
 
@@ -249,11 +332,9 @@ class RelativeClauseGenerator:
                         noun_phrase = PP.create(prep, noun_phrase)
 
             # Generate the appropriate form
-            gender = noun_phrase.getGender()
-
             if prep and base:
                 # Prepositional phrase
-                if definite and not base.is_definite:
+                if definite and not always_definite:
                     if number == Number.Sg:
                         form = noun_phrase.to(number, System.N, Article.Art)[0].value
                     else:
@@ -262,7 +343,7 @@ class RelativeClauseGenerator:
                     form = noun_phrase.to(number)[0].value
 
                 if base:
-                    if base.isDefinite or not definite:
+                    if always_definite or not definite:
                         base = base.to(number, Case.Nom)[0].value
                     else:
                         base = base.to(number, Case.Nom, Article.Art)[0].value
@@ -270,7 +351,7 @@ class RelativeClauseGenerator:
                 result.append((symbol, form, prep, base, plural, gender, noun))
             else:
                 # Direct object phrase
-                if noun_phrase.isDefinite or not definite:
+                if always_definite or not definite:
                     form = noun_phrase.to(number, Case.Nom)[0].value
                 else:
                     form = noun_phrase.to(number, Case.Nom, Article.Art)[0].value
@@ -280,7 +361,8 @@ class RelativeClauseGenerator:
         return result
 
     def generate_variations(self, line: str, words: List[str], verb_text: str, 
-                           direct_symbols: set, indirect_symbols: set) -> List[Tuple[str, Dict]]:
+                           direct_symbols: set, indirect_symbols: set,
+                           dedup: Optional[DedupIndex] = None) -> List[Tuple[str, Dict]]:
         """
         Generate relative clause variations of a sentence.
 
@@ -295,17 +377,15 @@ class RelativeClauseGenerator:
             verb_text: The verb in brackets
             direct_symbols: Set of direct object symbols
             indirect_symbols: Set of indirect object symbols
+            dedup: Optional index of examples already generated
 
         Returns:
-            List of (type, coded_sentence) tuples
+            List of (type, coded_sentence) tuples, empty if `dedup` has
+            already seen this combination of choices
         """
-        # Get verb and prepare noun phrases
-        verb = self.dictionaries["verb"][verb_text[1:-1]]  # Remove brackets
-        verb_phrase = VP.from_verb(verb)
-
-        # Prepare direct and indirect objects
-        direct_objects = self._prepare_noun_phrases(direct_symbols, is_indirect=False)
-        indirect_objects = self._prepare_noun_phrases(indirect_symbols, is_indirect=True)
+        # Choose direct and indirect objects
+        direct_choices = self._choose_noun_features(direct_symbols)
+        indirect_choices = self._choose_noun_features(indirect_symbols)
 
         # Select random verb forms
         tense = choice([t for t in VPTense 
@@ -314,6 +394,20 @@ class RelativeClauseGenerator:
         polarity = choices([VPPolarity.Neg, VPPolarity.Pos], weights=[0.3, 0.7])[0]
         person_form = VPPerson.NoSubject
 
+        # Drop repeats before doing any inflection work; the example is only
+        # recorded once its variations have been built, so failures can be retried
+        example_key = ("clause", line.strip(), tense.name, shape.name, polarity.name,
+                       sorted(direct_choices), sorted(indirect_choices))
+        if dedup is not None and dedup.seen(*example_key):
+            return []
+
+        # Get verb and prepare noun phrases
+        verb = self.dictionaries["verb"][verb_text[1:-1]]  # Remove brackets
+        verb_phrase = VP.from_verb(verb)
+
+        direct_objects = self._prepare_noun_phrases(direct_choices, is_indirect=False)
+        indirect_objects = self._prepare_noun_phrases(indirect_choices, is_indirect=True)
+
         variations = []
 
         # Helper function to create a variation
@@ -376,34 +470,41 @@ class RelativeClauseGenerator:
                 print(f"-> {variation_type}: {coded.get('_coded', '')}")
         print()
 
+        if dedup is not None:
+            dedup.add(*example_key)
+
         return variations
 
 
-def load_gramadan_database(data_folder: str) -> Dict[str, Any]:
+def load_gramadan_database(data_folder: str, workers: Optional[int] = 1) -> Dict[str, Any]:
     """
     Load the Gramadán database containing Irish language data.
 
     Args:
         data_folder: Path to the Gramadán data folder
+        workers: Number of processes to parse the XML files in (None for one per CPU)
 
     Returns:
         Dictionary of grammatical elements
     """
-    database = Database(data_folder)
-    database.load()
-    return database.dictionary
+    return load_database(data_folder, workers)
 
 
-def main(data_folder: str):
+def main(data_folder: str, tokenised: bool = False, normalised: bool = False,
+         dedup_index: Optional[str] = None, workers: Optional[int] = 1):
     """
     Main function to generate relative clause examples.
 
     Args:
         data_folder: Path to the Gramadán data folder
+        tokenised: Emit pre-tokenised `_tokens` instead of `_coded` strings
+        normalised: Emit the normalised shared-lexicon format (see examples_format.py)
+        dedup_index: Optional file recording examples from earlier runs, so they are not repeated
+        workers: Number of processes to load the database with (None for one per CPU)
     """
     # Load grammatical data
     print("Loading Gramadán database...")
-    dictionaries = load_gramadan_database(data_folder)
+    dictionaries = load_gramadan_database(data_folder, workers)
 
     # Initialize generator
     generator = RelativeClauseGenerator(dictionaries)
@@ -420,8 +521,12 @@ def main(data_folder: str):
     # Generate examples
     print(f"Generating {SAMPLES} examples...")
     examples = []
+    dedup = DedupIndex(dedup_index)
+
+    for i in range(MAX_ATTEMPTS):
+        if len(examples) >= SAMPLES:
+            break
 
-    for i in range(SAMPLES):
         # Select random template
         template = template_lines[randint(0, len(template_lines) - 1)]
 
@@ -432,12 +537,16 @@ def main(data_folder: str):
 
             # Generate variations
             variations = generator.generate_variations(
-                template, words, verb, direct_symbols, indirect_symbols
+                template, words, verb, direct_symbols, indirect_symbols, dedup
             )
+            if not variations:
+                continue
 
             # Store results (without the display strings, just the coded versions)
             example_group = []
             for variation_type, coded_data in variations:
+                if tokenised:
+                    coded_data = tokenise_variation(coded_data)
                 example_group.append([variation_type, coded_data])
 
             examples.append(example_group)
@@ -451,14 +560,29 @@ def main(data_folder: str):
     output_file = Path(EXAMPLES_OUTPUT_FILE)
     print(f"Saving {len(examples)} examples to {EXAMPLES_OUTPUT_FILE}...")
     with output_file.open("w") as f:
-        json.dump(examples, f, indent=2, ensure_ascii=False)
+        if normalised:
+            json.dump(normalise_examples(examples), f, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump(examples, f, indent=2, ensure_ascii=False)
+
+    if dedup_index:
+        dedup.save()
 
     print(f"Successfully generated {len(examples)} examples!")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python make_clásal_coibhneasta.py <gramadan_data_folder>")
-        sys.exit(1)
-
-    main(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Generate Irish relative clause examples.")
+    parser.add_argument("data_folder", help="Path to the Gramadán data folder")
+    parser.add_argument("--tokenised", action="store_true",
+                        help="Emit each variation as pre-tokenised `_tokens` rather than a `_coded` string")
+    parser.add_argument("--normalised", action="store_true",
+                        help="Emit the normalised shared-lexicon format instead of one object per variation")
+    parser.add_argument("--dedup-index", metavar="PATH",
+                        help="File of previously generated examples to skip, updated after the run")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes to load the Gramadán database with (0 for one per CPU)")
+    args = parser.parse_args()
+
+    main(args.data_folder, tokenised=args.tokenised, normalised=args.normalised,
+         dedup_index=args.dedup_index, workers=args.workers or None)
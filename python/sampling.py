@@ -0,0 +1,188 @@
+"""
+Weighted sampling helpers for the example generators.
+"""
+
+from random import Random, random, randrange
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class AliasTable:
+    """
+    Draws indices in proportion to fixed weights in O(1), using Vose's alias method.
+
+    Building the table is O(n). Each draw picks a column uniformly and then
+    either keeps it or takes its alias, according to the column's probability.
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        Build the table.
+
+        Args:
+            weights: Non-negative weights, at least one of them positive
+        """
+        count = len(weights)
+        total = float(sum(weights))
+        if count == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight")
+
+        self.probability: List[float] = [1.0] * count
+        self.alias: List[int] = list(range(count))
+
+        scaled = [weight * count / total for weight in weights]
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        # Whatever is left over is 1 up to rounding error
+        for index in small + large:
+            self.probability[index] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.probability)
+
+    def draw(self, rng: Optional[Random] = None) -> int:
+        """Draw an index with probability proportional to its weight, optionally from `rng`."""
+        if rng is None:
+            column = randrange(len(self.probability))
+            return column if random() < self.probability[column] else self.alias[column]
+        column = rng.randrange(len(self.probability))
+        return column if rng.random() < self.probability[column] else self.alias[column]
+
+
+class DynamicWeightedSampler:
+    """
+    Draws indices in proportion to weights that can change between draws.
+
+    Weights are kept in a Fenwick (binary indexed) tree, so updating one
+    weight is O(log n), and until the weights settle draws descend the tree
+    in O(log n). Once there have been as many draws as items since the last
+    update, an AliasTable is built and later draws are O(1) until the next
+    update, so draws are amortised O(1) when updates are rare.
+
+    The weights and random state round-trip through `to_dict` and
+    `from_dict`, so a saved sampler carries on where it stopped. The tree is
+    rebuilt on loading, which also clears any rounding drift from updates.
+    """
+
+    def __init__(self, weights: Sequence[float], seed: Optional[int] = None):
+        """
+        Build the sampler.
+
+        Args:
+            weights: Non-negative weights, one per item
+            seed: Optional seed for the sampler's own random generator
+        """
+        if any(weight < 0 for weight in weights):
+            raise ValueError("Weights must not be negative")
+
+        self.weights: List[float] = [float(weight) for weight in weights]
+        self.rng = Random(seed)
+        self._tree = self._build_tree(self.weights)
+        self._alias: Optional[AliasTable] = None
+        self._draws_since_update = 0
+
+    @staticmethod
+    def _build_tree(weights: List[float]) -> List[float]:
+        """Build the 1-based Fenwick tree of `weights` in O(n)."""
+        tree = [0.0] + weights
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        return tree
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    @property
+    def total(self) -> float:
+        """Sum of all the weights."""
+        index, total = len(self.weights), 0.0
+        while index:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def update(self, index: int, weight: float):
+        """
+        Change the weight of one item in O(log n).
+
+        Args:
+            index: Item index
+            weight: New non-negative weight
+        """
+        if weight < 0:
+            raise ValueError("Weights must not be negative")
+
+        delta = float(weight) - self.weights[index]
+        self.weights[index] = float(weight)
+        position = index + 1
+        while position < len(self._tree):
+            self._tree[position] += delta
+            position += position & -position
+
+        self._alias = None
+        self._draws_since_update = 0
+
+    def draw(self) -> int:
+        """Draw an item index with probability proportional to its weight."""
+        if self._alias is None:
+            self._draws_since_update += 1
+            if self._draws_since_update >= len(self.weights):
+                self._alias = AliasTable(self.weights)
+        if self._alias is not None:
+            return self._alias.draw(self.rng)
+
+        # The tree's total can drift from zero as weights are updated, so check the weights
+        if not any(self.weights):
+            raise ValueError("DynamicWeightedSampler needs at least one positive weight")
+
+        # Find the first item whose cumulative weight exceeds the target
+        target = self.rng.random() * self.total
+        position = 0
+        step = 1 << (len(self.weights).bit_length() - 1)
+        while step:
+            following = position + step
+            if following <= len(self.weights) and self._tree[following] <= target:
+                position = following
+                target -= self._tree[following]
+            step >>= 1
+
+        # Rounding can land past the end or on an unweighted item, so take the nearest weighted one
+        if position < len(self.weights) and self.weights[position]:
+            return position
+        for index in range(min(position, len(self.weights) - 1), -1, -1):
+            if self.weights[index]:
+                return index
+        return next(index for index in range(position, len(self.weights)) if self.weights[index])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the sampler's state as JSON-serialisable data."""
+        version, state, gauss_next = self.rng.getstate()
+        return {
+            "weights": self.weights,
+            "draws_since_update": self._draws_since_update,
+            "rng": [version, list(state), gauss_next],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DynamicWeightedSampler":
+        """Restore a sampler saved with `to_dict`."""
+        sampler = cls.__new__(cls)
+        sampler.weights = [float(weight) for weight in data["weights"]]
+        sampler._tree = cls._build_tree(sampler.weights)
+        sampler._draws_since_update = data["draws_since_update"]
+        sampler._alias = AliasTable(sampler.weights) \
+            if sampler._draws_since_update >= len(sampler.weights) else None
+
+        version, state, gauss_next = data["rng"]
+        sampler.rng = Random()
+        sampler.rng.setstate((version, tuple(state), gauss_next))
+        return sampler
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The generator modules import each other from the python/ folder, as when run as scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,43 @@
+from dedup import DedupIndex, example_hash
+
+
+def test_example_hash_is_canonical():
+    assert example_hash("a", 1, [True]) == example_hash("a", 1, [True])
+    assert example_hash("a", 1) != example_hash("a", "1")
+
+
+def test_add_and_seen():
+    index = DedupIndex(pending_limit=4)
+    assert not index.seen("x")
+    assert index.add("x")
+    assert not index.add("x")
+    for value in range(10):
+        index.add(value)
+    assert len(index) == 11
+    assert index.seen("x") and index.seen(9)
+
+
+def test_persistence(tmp_path):
+    path = tmp_path / "index.bin"
+    index = DedupIndex(path)
+    index.add("x")
+    index.add("y")
+    index.save()
+
+    loaded = DedupIndex(path)
+    assert len(loaded) == 2
+    assert loaded.seen("x") and loaded.seen("y") and not loaded.seen("z")
+
+
+def test_concurrent_saves_keep_both_sides(tmp_path):
+    path = tmp_path / "index.bin"
+    first, second = DedupIndex(path), DedupIndex(path)
+    first.add("y")
+    second.add("z")
+    first.save()
+    second.save()
+
+    loaded = DedupIndex(path)
+    assert len(loaded) == 2
+    assert loaded.seen("y") and loaded.seen("z")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["index.bin", "index.bin.lock"]
@@ -0,0 +1,24 @@
+import json
+from pathlib import Path
+
+from examples_format import expand_normalised, normalise_examples, tokenise_coded
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples.json"
+
+
+def test_tokenise_coded():
+    slots = {"D0": ["fear", "an fear"], "I0": ["bean", "an bhean", "leis an mbean"], "I1": ["cat", "an cat", ""]}
+    assert tokenise_coded("${D0} a chuir ${I0R} ${I1R} ${I0}\n", slots) == [
+        ["D0", 1], " a chuir ", ["I0", 2], " ", ["I1", 1], " ", ["I0", 1],
+    ]
+
+
+def test_normalise_expand_round_trip():
+    with EXAMPLES.open(encoding="utf-8") as f:
+        examples = json.load(f)
+
+    expanded = expand_normalised(json.loads(json.dumps(normalise_examples(examples))))
+    for group in examples:
+        for _, coded_data in group:
+            coded_data["_coded"] = coded_data["_coded"].rstrip()
+    assert expanded == examples
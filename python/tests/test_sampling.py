@@ -0,0 +1,69 @@
+import json
+from collections import Counter
+from random import Random
+
+import pytest
+
+from sampling import AliasTable, DynamicWeightedSampler
+
+WEIGHTS = [1, 0, 3, 6]
+DRAWS = 100_000
+
+
+def frequencies(draw, count=DRAWS):
+    counts = Counter(draw() for _ in range(count))
+    return [counts[index] / count for index in range(len(WEIGHTS))]
+
+
+def assert_distribution(observed, weights):
+    total = sum(weights)
+    for frequency, weight in zip(observed, weights):
+        assert frequency == pytest.approx(weight / total, abs=0.01)
+
+
+def test_alias_table_distribution():
+    table = AliasTable(WEIGHTS)
+    rng = Random(1)
+    assert_distribution(frequencies(lambda: table.draw(rng)), WEIGHTS)
+
+
+def test_fenwick_distribution():
+    # Fewer draws than items since the last update, so every draw descends the tree
+    sampler = DynamicWeightedSampler(WEIGHTS * 100_000, seed=1)
+    observed = Counter(sampler.draw() % len(WEIGHTS) for _ in range(DRAWS))
+    assert sampler._alias is None
+    assert_distribution([observed[index] / DRAWS for index in range(len(WEIGHTS))], WEIGHTS)
+
+
+def test_draw_follows_updates():
+    sampler = DynamicWeightedSampler(WEIGHTS, seed=1)
+    frequencies(sampler.draw, 100)
+    assert sampler._alias is not None
+
+    sampler.update(1, 10)
+    sampler.update(3, 0)
+    assert_distribution(frequencies(sampler.draw), [1, 10, 3, 0])
+
+
+def test_all_weights_updated_to_zero():
+    sampler = DynamicWeightedSampler([0.1, 0.2, 0.7], seed=1)
+    for index in range(3):
+        sampler.update(index, 0)
+    with pytest.raises(ValueError):
+        sampler.draw()
+
+
+def test_negative_weight():
+    with pytest.raises(ValueError):
+        DynamicWeightedSampler([1, -1])
+
+
+@pytest.mark.parametrize("draws", [0, 2, 10])
+def test_restored_sampler_continues_sequence(draws):
+    sampler = DynamicWeightedSampler(WEIGHTS, seed=7)
+    sampler.update(1, 2.5)
+    for _ in range(draws):
+        sampler.draw()
+
+    restored = DynamicWeightedSampler.from_dict(json.loads(json.dumps(sampler.to_dict())))
+    assert [restored.draw() for _ in range(50)] == [sampler.draw() for _ in range(50)]